@@ -2,10 +2,37 @@ import pandas as pd
 import re
 import json
 import os
+import io
+import functools
+import logging
 import requests
+from requests.adapters import HTTPAdapter
 import boto3
+from botocore.config import Config
+from boto3.dynamodb.conditions import Attr
 from datetime import datetime # Import datetime for timestamps
 
+# Debug output goes through logging so it is skipped (unformatted) unless LOG_LEVEL=DEBUG
+logger = logging.getLogger(__name__)
+
+# Prefer the Rust-backed calamine engine; fall back to openpyxl if it is not in the Lambda layer
+try:
+    import python_calamine # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+# Compiled once at import; normalize_phone runs for every row of both Excel files
+_NON_DIGIT_RE = re.compile(r'\D')
+# str.translate delete-map for ASCII non-digits; cheaper than the regex for ASCII input
+_ASCII_NON_DIGIT_TBL = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
+# Contact categories the bot serves as commands; get_contacts is only called for these
+CONTACT_CATEGORIES = frozenset({
+    "auto", "housekeeping", "milkman", "authorities", "electrician",
+    "plumber", "services", "paperboy", "shops",
+})
+
 class TelegramBot:
     """
     A class to encapsulate all the logic for the Telegram bot, using the
@@ -13,12 +40,17 @@ class TelegramBot:
     """
     def __init__(self, token):
         """
-        Initializes the bot by setting up AWS clients and loading data.
+        Initializes the bot by setting up AWS clients. The Excel data is loaded
+        lazily from S3 on first use (see allowed_numbers / contacts_df).
         """
         if not token:
             raise ValueError("Telegram Bot Token is required and cannot be empty.")
         self.TOKEN = token
         self.BASE_URL = f"https://api.telegram.org/bot{self.TOKEN}/"
+        # Pooled keep-alive session; the bot is a module-level global, so warm
+        # invocations reuse the TLS connection to api.telegram.org
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
         
         # --- AWS & Environment Setup ---
         # Get S3 Bucket name from environment variable
@@ -30,29 +62,74 @@ class TelegramBot:
         self.ALLOWED_USERS_KEY = "allowed_users.xlsx"
         self.CONTACTS_KEY = "contacts.xlsx"
         self.WASTE_MANAGEMENT_PDF_KEY = "waste_management.pdf" # <--- NEW: PDF file key
+        # Contact sheet columns plus the lookup columns precomputed at load time
+        self.CONTACT_COLUMNS = ["Category", "Name", "Number", "_category_key", "_number_fmt"]
 
-        # Initialize AWS clients
+        # Initialize AWS clients. The bot lives across warm invocations, so a larger
+        # keep-alive pool lets later S3/DynamoDB calls reuse open TLS connections.
+        aws_config = Config(
+            max_pool_connections=10,
+            retries={"max_attempts": 2, "mode": "standard"},
+            tcp_keepalive=True,
+        )
         try:
-            self.s3_client = boto3.client("s3")
-            self.dynamodb = boto3.resource("dynamodb")
+            self.s3_client = boto3.client("s3", config=aws_config)
+            self.dynamodb = boto3.resource("dynamodb", config=aws_config)
             self.verified_users_table = self.dynamodb.Table(self.DYNAMODB_TABLE_NAME)
             print(f"AWS clients initialized. S3 Bucket: {self.S3_BUCKET_NAME}, DynamoDB Table: {self.DYNAMODB_TABLE_NAME}")
         except Exception as e:
             print(f"❌ FATAL ERROR: Could not initialize AWS clients or DynamoDB table: {e}")
             raise # Re-raise to stop initialization if AWS clients fail
 
-        # Load data upon initialization
-        self.allowed_numbers = self.load_allowed_users_from_s3()
-        self.contacts_df = self.load_contacts_from_s3()
+        # Per-container cache of chat_ids already known to be verified. Verification is only
+        # ever granted (never revoked) by this bot, so a hit can skip the DynamoDB lookup.
+        # A dict keeps insertion order, letting the oldest entry be evicted once the cap is hit.
+        self.VERIFIED_CACHE_MAX = 4096
+        self._verified_cache: dict[int, None] = {}
+
+        # Documents fetched from S3, kept in memory for the lifetime of the container
+        # (same as the Excel data), so warm requests skip the S3 GET
+        self._document_cache: dict[str, bytes] = {}
+        # Telegram file_id of each document once it has been uploaded; resending by
+        # file_id needs neither the S3 bytes nor a multipart upload
+        self._telegram_file_ids: dict[str, str] = {}
+
+    # --- Lazily loaded S3 data ---
+    # Each file is read on first use and then cached for the lifetime of the container,
+    # so a cold start only pays for the data the first request actually needs.
+    @functools.cached_property
+    def allowed_numbers(self) -> frozenset:
+        return self.load_allowed_users_from_s3()
+
+    @functools.cached_property
+    def contacts_df(self) -> pd.DataFrame:
+        return self.load_contacts_from_s3()
+
+    @functools.cached_property
+    def contacts_by_cat(self) -> dict:
+        return self.build_contacts_by_category(self.contacts_df)
+
+    @functools.cached_property
+    def contacts_messages(self) -> dict:
+        return self.render_contacts_messages(self.contacts_by_cat)
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096) # Allowed-list and contacts normalize the same numbers repeatedly
     def normalize_phone(phone: str) -> str:
         """
         Formates a phone number into the "+91 XXXXX XXXXX" format.
         Handles various input formats to clean and standardize.
         """
-        # Remove all non-digit characters
-        cleaned = re.sub(r'\D', '', str(phone))
+        if phone is None:
+            return ""
+        s = phone if type(phone) is str else str(phone)
+
+        # Hot path: already a bare 10-digit number
+        if len(s) == 10 and s.isascii() and s.isdigit():
+            return f"+91 {s[:5]} {s[5:]}"
+
+        # Remove all non-digit characters (regex only for non-ASCII input)
+        cleaned = s.translate(_ASCII_NON_DIGIT_TBL) if s.isascii() else _NON_DIGIT_RE.sub('', s)
 
         if len(cleaned) == 10: # Assumes Indian 10-digit number
             return f"+91 {cleaned[:5]} {cleaned[5:]}"
@@ -65,79 +142,179 @@ class TelegramBot:
         print(f"WARNING: Phone number '{phone}' could not be normalized to +91 format. Returning as is: {cleaned}")
         return cleaned
 
-    def load_allowed_users_from_s3(self) -> set:
+    @staticmethod
+    def normalize_phone_series(numbers: pd.Series) -> pd.Series:
+        """
+        Vectorized equivalent of normalize_phone for a whole column.
+        Missing and empty values are returned as <NA>.
+        """
+        digits = numbers.astype("string").str.replace(_NON_DIGIT_RE, "", regex=True)
+        out = digits.copy() # Numbers that match no rule are kept as their digits, like normalize_phone
+
+        ten = digits.str.len() == 10 # Assumes Indian 10-digit number
+        out[ten] = "+91 " + digits[ten].str.slice(0, 5) + " " + digits[ten].str.slice(5, 10)
+
+        twelve = (digits.str.len() == 12) & digits.str.startswith("91") # Already includes 91 prefix
+        out[twelve] = "+91 " + digits[twelve].str.slice(2, 7) + " " + digits[twelve].str.slice(7, 12)
+
+        unmatched = int((~(ten | twelve) & (digits.str.len() > 0)).sum())
+        if unmatched:
+            print(f"WARNING: {unmatched} phone number(s) could not be normalized to +91 format. Keeping their digits as is.")
+        return out.mask(out == "")
+
+    @staticmethod
+    def read_number_column_openpyxl(body: bytes):
+        """
+        Returns the non-empty values of the 'Number' column of the first sheet,
+        or None if the sheet has no such column. Uses openpyxl's read-only mode.
+        """
+        import openpyxl # Only needed (and only paid for at import) when calamine is unavailable
+
+        wb = openpyxl.load_workbook(io.BytesIO(body), read_only=True, data_only=True)
+        try:
+            rows = wb.worksheets[0].iter_rows(values_only=True)
+            header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+            if "Number" not in header:
+                return None
+            idx = header.index("Number")
+
+            numbers = []
+            for row in rows:
+                value = row[idx] if idx < len(row) else None
+                if value is None:
+                    continue
+                if isinstance(value, float) and value.is_integer():
+                    value = int(value) # Numeric cells would otherwise gain a trailing '.0' digit
+                numbers.append(value)
+            return numbers
+        finally:
+            wb.close() # Read-only workbooks keep the source open until closed
+
+    def load_allowed_users_from_s3(self) -> frozenset:
         """
         Loads allowed phone numbers from an Excel file stored in S3.
-        Downloads the file to Lambda's /tmp directory first.
+        The object is read straight into memory; nothing is written to /tmp.
         """
         if not self.S3_BUCKET_NAME:
             print("❌ Error: S3_BUCKET_NAME environment variable not set. Cannot load allowed users from S3.")
-            return set()
+            return frozenset()
         
-        file_path = f"/tmp/{self.ALLOWED_USERS_KEY}"
         try:
-            self.s3_client.download_file(self.S3_BUCKET_NAME, self.ALLOWED_USERS_KEY, file_path)
-            df = pd.read_excel(file_path, dtype=str)
-            df.columns = df.columns.str.strip() # Strip whitespace from column names
+            obj = self.s3_client.get_object(Bucket=self.S3_BUCKET_NAME, Key=self.ALLOWED_USERS_KEY)
+            body = obj["Body"].read()
+
+            if EXCEL_ENGINE == "calamine":
+                # Rust-backed calamine engine; only the 'Number' column is materialized
+                with pd.ExcelFile(io.BytesIO(body), engine="calamine") as xls:
+                    df = xls.parse(0, dtype=str, usecols=lambda col: str(col).strip() == "Number")
+                df.columns = df.columns.str.strip() # Strip whitespace from column names
+                numbers = self.normalize_phone_series(df["Number"]).dropna() if "Number" in df.columns else None
+            else:
+                # Without calamine, iterate the sheet with openpyxl directly instead of building a DataFrame
+                raw_numbers = self.read_number_column_openpyxl(body)
+                numbers = None if raw_numbers is None else (self.normalize_phone(n) for n in raw_numbers)
             
-            if "Number" not in df.columns:
+            if numbers is None:
                 print(f"❌ Error: 'Number' column not found in {self.ALLOWED_USERS_KEY} in S3 bucket '{self.S3_BUCKET_NAME}'.")
-                return set()
+                return frozenset()
             
-            formatted_numbers = set(df["Number"].apply(self.normalize_phone))
+            # Read-only after load, so a frozenset is enough
+            formatted_numbers = frozenset(n for n in numbers if n)
             print(f"✅ Loaded {len(formatted_numbers)} allowed numbers from S3: {self.S3_BUCKET_NAME}/{self.ALLOWED_USERS_KEY}")
             return formatted_numbers
         except self.s3_client.exceptions.NoSuchBucket:
             print(f"❌ Error: S3 Bucket '{self.S3_BUCKET_NAME}' does not exist or is not accessible.")
-            return set()
+            return frozenset()
         except self.s3_client.exceptions.NoSuchKey:
             print(f"❌ Error: S3 object '{self.ALLOWED_USERS_KEY}' not found in bucket '{self.S3_BUCKET_NAME}'.")
-            return set()
+            return frozenset()
         except Exception as e:
             print(f"❌ General error loading allowed users from S3: {e}")
-            return set()
+            return frozenset()
 
     def load_contacts_from_s3(self) -> pd.DataFrame:
         """
         Loads contact details from an Excel file stored in S3.
-        Downloads the file to Lambda's /tmp directory first.
+        The object is read straight into memory; nothing is written to /tmp.
         """
         if not self.S3_BUCKET_NAME:
             print("❌ Error: S3_BUCKET_NAME environment variable not set. Cannot load contacts from S3.")
-            return pd.DataFrame(columns=["Category", "Name", "Number"]) # Return empty DataFrame
+            return pd.DataFrame(columns=self.CONTACT_COLUMNS) # Return empty DataFrame
         
-        file_path = f"/tmp/{self.CONTACTS_KEY}"
         try:
-            self.s3_client.download_file(self.S3_BUCKET_NAME, self.CONTACTS_KEY, file_path)
+            obj = self.s3_client.get_object(Bucket=self.S3_BUCKET_NAME, Key=self.CONTACTS_KEY)
             
-            print(f"DEBUG: Successfully downloaded {self.CONTACTS_KEY} to {file_path}")
+            logger.debug("Successfully fetched %s (%s bytes)", self.CONTACTS_KEY, obj['ContentLength'])
             
-            df = pd.read_excel(file_path, dtype=str)
+            with pd.ExcelFile(io.BytesIO(obj["Body"].read()), engine=EXCEL_ENGINE) as xls:
+                df = xls.parse(0, dtype=str)
             
-            print(f"DEBUG: Original columns read by pandas: {df.columns.tolist()}")
+            logger.debug("Original columns read by pandas: %s", df.columns)
             
             df.columns = df.columns.str.strip() # Strip whitespace from column names
             
-            print(f"DEBUG: Columns after stripping whitespace: {df.columns.tolist()}")
+            logger.debug("Columns after stripping whitespace: %s", df.columns)
+            
+            # Precompute the lookup key and display number once, instead of on every command
+            if "Category" in df.columns:
+                df["_category_key"] = df["Category"].astype(str).str.strip().str.lower()
+            if "Number" in df.columns:
+                df["_number_fmt"] = df["Number"].map(self.normalize_phone)
+            else:
+                print(f"WARNING: 'Number' column missing in {self.CONTACTS_KEY}. Numbers will be shown as N/A.")
+                df["_number_fmt"] = "N/A"
             
             print(f"✅ Loaded {len(df)} contacts from S3: {self.S3_BUCKET_NAME}/{self.CONTACTS_KEY}")
             return df
         except self.s3_client.exceptions.NoSuchBucket:
             print(f"❌ Error: S3 Bucket '{self.S3_BUCKET_NAME}' does not exist or is not accessible.")
-            return pd.DataFrame(columns=["Category", "Name", "Number"])
+            return pd.DataFrame(columns=self.CONTACT_COLUMNS)
         except self.s3_client.exceptions.NoSuchKey:
             print(f"❌ Error: S3 object '{self.CONTACTS_KEY}' not found in bucket '{self.S3_BUCKET_NAME}'.")
-            return pd.DataFrame(columns=["Category", "Name", "Number"])
+            return pd.DataFrame(columns=self.CONTACT_COLUMNS)
         except Exception as e:
             print(f"❌ General error loading contacts from S3: {e}")
-            return pd.DataFrame(columns=["Category", "Name", "Number"])
+            return pd.DataFrame(columns=self.CONTACT_COLUMNS)
+
+    @staticmethod
+    def build_contacts_by_category(df: pd.DataFrame) -> dict:
+        """
+        Collapses the contacts DataFrame into {category_key: [(name, number), ...]},
+        the only shape get_contacts needs, so requests never touch pandas.
+        """
+        contacts_by_cat: dict[str, list[tuple[str, str]]] = {}
+        if "_category_key" not in df.columns:
+            return contacts_by_cat
+
+        names = df["Name"] if "Name" in df.columns else ["N/A"] * len(df)
+        for key, name, number in zip(df["_category_key"], names, df["_number_fmt"]):
+            # Rows with a blank Category cannot be requested by any command; skip them so a
+            # missing (NaN) key never reaches rendering and breaks the other categories
+            if pd.isna(key) or not key:
+                continue
+            contacts_by_cat.setdefault(key, []).append((name, number))
+        return contacts_by_cat
+
+    @staticmethod
+    def render_contacts_messages(contacts_by_cat: dict) -> dict:
+        """
+        Pre-renders the Markdown reply for every category, so get_contacts only
+        has to look up the finished text.
+        """
+        messages = {}
+        for category, rows in contacts_by_cat.items():
+            message_parts = [f"📌 **{category.capitalize()} Contacts:**\n\n"] # Added extra newline for spacing
+            for name, formatted_number in rows:
+                message_parts.append(f"• **{name}**\n  📞 `{formatted_number}`\n\n") # Added extra newline for spacing
+            messages[category] = "".join(message_parts).strip()
+        return messages
 
     def send_message(self, chat_id, text):
         """Sends a Markdown-formatted message via the Telegram API."""
         url = f"{self.BASE_URL}sendMessage"
         payload = {"chat_id": chat_id, "text": text, "parse_mode": "Markdown"}
         try:
-            response = requests.post(url, json=payload)
+            response = self.session.post(url, json=payload)
             response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
             print(f"✅ Sent message to {chat_id}. Status Code: {response.status_code}")
         except requests.exceptions.RequestException as e:
@@ -155,7 +332,7 @@ class TelegramBot:
             }
         }
         try:
-            response = requests.post(f"{self.BASE_URL}sendMessage", json=payload)
+            response = self.session.post(f"{self.BASE_URL}sendMessage", json=payload)
             response.raise_for_status()
             print(f"✅ Requested contact from {chat_id}. Status Code: {response.status_code}")
         except requests.exceptions.RequestException as e:
@@ -164,15 +341,23 @@ class TelegramBot:
     def is_user_verified(self, chat_id: int) -> bool:
         """
         Checks DynamoDB to see if a user is verified using their chat_id as the primary key.
+        Users already seen as verified in this container are answered from memory.
         """
-        print(f"DEBUG: Checking verification status for chat_id: {chat_id} in table '{self.DYNAMODB_TABLE_NAME}'")
+        if chat_id in self._verified_cache:
+            return True
+
+        logger.debug("Checking verification status for chat_id: %s in table '%s'", chat_id, self.DYNAMODB_TABLE_NAME)
         try:
             response = self.verified_users_table.get_item(
-                Key={'chat_id': chat_id} # Use 'chat_id' as the key name, value is int
+                Key={'chat_id': chat_id}, # Use 'chat_id' as the key name, value is int
+                ProjectionExpression="chat_id", # Only existence matters; return just the key
+                ConsistentRead=False # Eventually consistent reads cost half and suffice here
             )
             is_verified = 'Item' in response
-            print(f"DEBUG: DynamoDB GetItem response for {chat_id}: {response}")
-            print(f"DEBUG: User {chat_id} verification status: {is_verified}")
+            logger.debug("DynamoDB GetItem response for %s: %s", chat_id, response)
+            logger.debug("User %s verification status: %s", chat_id, is_verified)
+            if is_verified:
+                self._remember_verified(chat_id)
             return is_verified
         except Exception as e:
             print(f"❌ Error checking user verification status for {chat_id} in DynamoDB: {e}")
@@ -180,10 +365,17 @@ class TelegramBot:
             print(traceback.format_exc())
             return False
 
+    def _remember_verified(self, chat_id: int):
+        """Adds chat_id to the verified cache, evicting the oldest entry when full."""
+        if len(self._verified_cache) >= self.VERIFIED_CACHE_MAX:
+            self._verified_cache.pop(next(iter(self._verified_cache)))
+        self._verified_cache[chat_id] = None
+
     def save_verified_user(self, chat_id: int, phone_number: str):
         """
         Saves a verified user's chat_id and phone_number to DynamoDB.
-        Includes a timestamp for auditing.
+        Includes a timestamp for auditing. An existing record is left untouched,
+        so the original verification time is kept.
         """
         try:
             self.verified_users_table.put_item(
@@ -191,9 +383,14 @@ class TelegramBot:
                     'chat_id': chat_id, # Must match Partition Key name and type in DynamoDB
                     'phone_number': phone_number,
                     'verified_at': datetime.now().isoformat()
-                }
+                },
+                ConditionExpression=Attr('chat_id').not_exists()
             )
             print(f"✅ Saved user {chat_id} with phone {phone_number} to DynamoDB.")
+            self._remember_verified(chat_id)
+        except self.verified_users_table.meta.client.exceptions.ConditionalCheckFailedException:
+            print(f"User {chat_id} is already saved in DynamoDB. Keeping the existing record.")
+            self._remember_verified(chat_id)
         except Exception as e:
             print(f"❌ Error saving user {chat_id} to DynamoDB: {e}")
             import traceback
@@ -205,75 +402,97 @@ class TelegramBot:
         If it does, the user's chat_id and phone_number are stored in DynamoDB.
         """
         formatted_number = self.normalize_phone(phone_number)
-        print(f"DEBUG: Attempting to verify contact {formatted_number} for chat_id: {chat_id}")
+        logger.debug("Attempting to verify contact %s for chat_id: %s", formatted_number, chat_id)
         if formatted_number in self.allowed_numbers:
             self.save_verified_user(chat_id, formatted_number)
             return True
         else:
-            print(f"DEBUG: Phone number {formatted_number} not in allowed_numbers for chat_id: {chat_id}")
+            logger.debug("Phone number %s not in allowed_numbers for chat_id: %s", formatted_number, chat_id)
             return False
 
     def get_contacts(self, chat_id, category):
         """
-        Fetches and sends contact details for a specific category from the loaded DataFrame.
+        Sends the pre-rendered contact details for a specific category.
         """
         try:
-            # Filter contacts DataFrame by category (case-insensitive)
-            # Ensure 'Category' column exists and is handled as string before lowercasing
-            if "Category" not in self.contacts_df.columns:
+            # '_category_key' is derived from 'Category' at load time and is absent without it
+            if "_category_key" not in self.contacts_df.columns:
                 print("❌ ERROR: 'Category' column not found in contacts_df. Cannot filter.")
                 self.send_message(chat_id, f"❌ Internal error: Contact data is missing the 'Category' column.")
                 return
 
-            # Strip spaces from the values in the 'Category' column before comparing
-            filtered = self.contacts_df[self.contacts_df["Category"].astype(str).str.strip().str.lower() == category.lower()]
+            # Case-insensitive lookup; keys were stripped and lowercased at load time
+            text = self.contacts_messages.get(category.lower())
             
-            if filtered.empty:
+            if not text:
                 self.send_message(chat_id, f"🚫 No contacts found for `{category.capitalize()}`. Please check the command or spelling!")
                 return
 
-            message_parts = [f"📌 **{category.capitalize()} Contacts:**\n\n"] # Added extra newline for spacing
-            for _, row in filtered.iterrows():
-                name = row.get('Name', 'N/A')
-                # Ensure 'Number' column exists before trying to get it
-                number = row.get('Number', 'N/A') 
-                
-                # If 'Number' column was not found, 'number' will be 'N/A'
-                if number == 'N/A':
-                    print(f"WARNING: 'Number' column missing for a row in category '{category}'. Contact name: {name}")
-
-                formatted_number = self.normalize_phone(number)
-                message_parts.append(f"• **{name}**\n  📞 `{formatted_number}`\n\n") # Added extra newline for spacing
-            
-            self.send_message(chat_id, "".join(message_parts).strip())
+            self.send_message(chat_id, text)
         except Exception as e:
             print(f"❌ Error in get_contacts for '{category}': {e}")
             import traceback
             print(traceback.format_exc()) # Print full traceback for deeper debugging
             self.send_message(chat_id, f"❌ An internal error occurred while fetching details for `{category.capitalize()}`.")
 
+    @staticmethod
+    def _is_rejected_file_id(response) -> bool:
+        """True if a Telegram error response says the file identifier itself is invalid."""
+        if response.status_code != 400:
+            return False
+        try:
+            description = str(response.json().get("description", "")).lower()
+        except ValueError:
+            return False
+        return "file identifier" in description or "file_id" in description
+
     def send_document(self, chat_id, file_key, caption=None): # <--- NEW METHOD FOR SENDING DOCUMENTS
         """
-        Downloads a file from S3 and sends it as a document via Telegram.
+        Fetches a file from S3 into memory and sends it as a document via Telegram.
+        The file is fetched once per container and served from memory afterwards;
+        once Telegram has stored it, later sends just reference its file_id.
         """
-        local_file_path = f"/tmp/{os.path.basename(file_key)}"
         try:
-            print(f"Attempting to download {file_key} from S3 bucket {self.S3_BUCKET_NAME} to {local_file_path}")
-            self.s3_client.download_file(self.S3_BUCKET_NAME, file_key, local_file_path)
-            print(f"Successfully downloaded {file_key}.")
-
             url = f"{self.BASE_URL}sendDocument"
+            data = {'chat_id': chat_id}
+            if caption:
+                data['caption'] = caption
+
+            file_id = self._telegram_file_ids.get(file_key)
+            if file_id:
+                response = self.session.post(url, data={**data, 'document': file_id})
+                if response.ok:
+                    print(f"✅ Sent document {file_key} to {chat_id} by file_id. Status Code: {response.status_code}")
+                    return
+                if not self._is_rejected_file_id(response):
+                    # Rate limits, blocked users, unknown chats, 5xx: a re-upload would fail the same way
+                    response.raise_for_status()
+                # Telegram no longer accepts this file_id; forget it and upload the file again
+                print(f"WARNING: Telegram rejected the file_id for {file_key}. Re-uploading.")
+                self._telegram_file_ids.pop(file_key, None)
+
+            content = self._document_cache.get(file_key)
+            if content is None:
+                print(f"Attempting to fetch {file_key} from S3 bucket {self.S3_BUCKET_NAME}")
+                obj = self.s3_client.get_object(Bucket=self.S3_BUCKET_NAME, Key=file_key)
+                content = obj["Body"].read()
+                if content: # Never cache an empty body
+                    self._document_cache[file_key] = content
+                print(f"Successfully fetched {file_key}.")
+            buf = io.BytesIO(content)
             
-            # Open the file in binary read mode
-            with open(local_file_path, 'rb') as f:
-                files = {'document': f}
-                data = {'chat_id': chat_id}
-                if caption:
-                    data['caption'] = caption
-
-                response = requests.post(url, data=data, files=files)
-                response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
-                print(f"✅ Sent document {file_key} to {chat_id}. Status Code: {response.status_code}")
+            # Upload straight from the in-memory buffer, keeping the original file name
+            files = {'document': (os.path.basename(file_key), buf)}
+
+            response = self.session.post(url, data=data, files=files)
+            response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
+            print(f"✅ Sent document {file_key} to {chat_id}. Status Code: {response.status_code}")
+
+            try:
+                file_id = response.json()["result"]["document"]["file_id"]
+                self._telegram_file_ids[file_key] = file_id
+            except (ValueError, KeyError, TypeError):
+                print(f"WARNING: No file_id in Telegram response for {file_key}; it will be uploaded again next time.")
         except self.s3_client.exceptions.NoSuchBucket:
             print(f"❌ Error: S3 Bucket '{self.S3_BUCKET_NAME}' does not exist or is not accessible.")
             self.send_message(chat_id, "❌ Error: The file storage bucket could not be found.")
@@ -287,9 +506,4 @@ class TelegramBot:
             print(f"❌ General error in send_document for '{file_key}': {e}")
             import traceback
             print(traceback.format_exc())
-            self.send_message(chat_id, "❌ An unexpected error occurred while processing your document request.")
-        finally:
-            # Clean up the downloaded file from /tmp to save space
-            if os.path.exists(local_file_path):
-                os.remove(local_file_path)
-                print(f"Cleaned up {local_file_path}")
\ No newline at end of file
+            self.send_message(chat_id, "❌ An unexpected error occurred while processing your document request.")
\ No newline at end of file
@@ -1,18 +1,30 @@
 import zipfile
 import os
 
-def zip_folder_all(folder_path, output_path):
+# Files that are already compressed gain nothing from DEFLATE, so they are stored as is
+ALREADY_COMPRESSED_EXTS = {
+    ".zip", ".whl", ".egg", ".jar", ".gz", ".tgz", ".bz2", ".xz", ".7z",
+    ".xlsx", ".docx", ".pdf", ".png", ".jpg", ".jpeg", ".gif", ".webp",
+}
+
+def zip_folder_all(folder_path, output_path, compresslevel=6):
     if not os.path.exists(folder_path):
         print(f"Folder not found: {folder_path}")
         return
 
+    output_abspath = os.path.abspath(output_path)
     files_added = 0
-    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
         for root, dirs, files in os.walk(folder_path):
             for file in files:
                 file_path = os.path.join(root, file)
+                if os.path.abspath(file_path) == output_abspath:
+                    continue # Don't zip the archive being written into itself
                 arcname = os.path.relpath(file_path, folder_path)
-                zipf.write(file_path, arcname)
+                if os.path.splitext(file)[1].lower() in ALREADY_COMPRESSED_EXTS:
+                    zipf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+                else:
+                    zipf.write(file_path, arcname)
                 print(f"Added: {arcname}")
                 files_added += 1
 
@@ -21,7 +33,8 @@ def zip_folder_all(folder_path, output_path):
     else:
         print(f"ZIP file created: {output_path} ({files_added} files)")
 
-zip_folder_all(
-    r'D:\HARSHAMBOT1',
-    r'D:\HARSHAMBOT1\output.zip'
-)   
\ No newline at end of file
+if __name__ == "__main__":
+    zip_folder_all(
+        r'D:\HARSHAMBOT1',
+        r'D:\HARSHAMBOT1\output.zip'
+    )
@@ -1,10 +1,32 @@
 import json
 import os
-from detailsharsham import TelegramBot # Import the bot logic class
+import logging
+import boto3
+from detailsharsham import TelegramBot, CONTACT_CATEGORIES # Import the bot logic class and known categories
+
+def _parse_log_level(value):
+    """Maps LOG_LEVEL ('debug', 'INFO', '10', ...) to a logging level, defaulting to INFO."""
+    value = (value or "INFO").strip().upper()
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value)
+    if not isinstance(level, int):
+        print(f"WARNING: Unknown LOG_LEVEL '{value}'. Falling back to INFO.")
+        return logging.INFO
+    return level
+
+# The Lambda runtime attaches a handler to the root logger, and our records propagate to it.
+# The level is only set on this app's own loggers, so LOG_LEVEL=DEBUG does not also turn on
+# botocore/urllib3 debug output. Debug logs (full event payloads etc.) are only formatted then.
+LOG_LEVEL = _parse_log_level(os.environ.get("LOG_LEVEL"))
+logger = logging.getLogger(__name__)
+for _app_logger in (logger, logging.getLogger("detailsharsham")):
+    _app_logger.setLevel(LOG_LEVEL)
 
 # Initialize bot instance globally to persist across warm invocations.
-# This avoids re-initializing S3/DynamoDB clients and re-loading Excel files
-# on every invocation if the Lambda container is reused.
+# This avoids re-initializing S3/DynamoDB clients on every invocation if the
+# Lambda container is reused. The Excel files are read from S3 on first use
+# and stay cached on the instance afterwards.
 TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 
 # Basic check for token at global scope
@@ -20,12 +42,18 @@ except ValueError as ve:
     # Re-raise or handle if token is missing
     raise
 
+# Optional SQS queue that decouples the Telegram webhook from the actual processing.
+# When set, webhook_lambda only enqueues updates and worker_lambda handles them.
+UPDATES_QUEUE_URL = os.environ.get("UPDATES_QUEUE_URL")
+sqs_client = boto3.client("sqs") if UPDATES_QUEUE_URL else None
+
 def lambda_handler(event, context):
     """
     Process webhook updates from Telegram and handle user interactions.
-    This is the main entry point for the AWS Lambda function.
+    Can be used directly as the webhook entry point (synchronous processing),
+    and is also what worker_lambda runs for every queued update.
     """
-    print(f"📩 Incoming Event: {json.dumps(event, indent=2)}")
+    logger.debug("📩 Incoming Event: %s", event)
 
     try:
         # --- Basic Input Validation ---
@@ -90,12 +118,11 @@ def lambda_handler(event, context):
         # Normalize the command (remove leading '/' if present)
         command = user_message_text[1:] if user_message_text.startswith('/') else user_message_text
 
-        # List of recognized commands/categories
+        # Recognized contact categories live in CONTACT_CATEGORIES (a frozenset, O(1) lookup)
         # It's good practice to keep document commands separate from contact categories
-        contact_categories = ["auto", "housekeeping", "milkman", "authorities", "electrician", "plumber","services","paperboy","shops"] 
         document_commands = ["wastemanagementpdf"] # <--- NEW: Document command
 
-        if command in contact_categories:
+        if command in CONTACT_CATEGORIES:
             print(f"Verified user {chat_id} requested contact category: {command}")
             bot.get_contacts(chat_id, command)
         elif command == "wastemanagementpdf": # <--- NEW: Handle the PDF command
@@ -145,4 +172,54 @@ def lambda_handler(event, context):
         except Exception as inner_e:
             print(f"⚠️ Failed to send error message to user: {inner_e}")
             
-        return {"statusCode": 500, "body": json.dumps({"error": "Internal Server Error"})}
\ No newline at end of file
+        return {"statusCode": 500, "body": json.dumps({"error": "Internal Server Error"})}
+
+def webhook_lambda(event, context):
+    """
+    Entry point for the Telegram webhook when UPDATES_QUEUE_URL is configured.
+    Validates the update, pushes it onto SQS and returns 200 right away, so Telegram
+    never waits on DynamoDB/S3/Telegram round-trips (and does not retry on timeouts).
+    """
+    if "body" not in event:
+        print("❌ Error: Invalid request format - 'body' not in event.")
+        return {"statusCode": 400, "body": json.dumps({"error": "Invalid request format: 'body' key missing."})}
+
+    try:
+        json.loads(event["body"])
+    except (TypeError, json.JSONDecodeError): # TypeError: API Gateway can send "body": null
+        print("❌ Error: Could not decode JSON body.")
+        return {"statusCode": 400, "body": json.dumps({"error": "Invalid JSON in request body."})}
+
+    if sqs_client is None:
+        # No queue configured: fall back to processing the update inline
+        print("WARNING: UPDATES_QUEUE_URL not set. Processing update synchronously.")
+        return lambda_handler(event, context)
+
+    try:
+        sqs_client.send_message(QueueUrl=UPDATES_QUEUE_URL, MessageBody=event["body"])
+    except Exception as e:
+        print(f"❌ Error enqueuing update to SQS: {e}")
+        # A non-2xx response makes Telegram redeliver the update later
+        return {"statusCode": 500, "body": json.dumps({"error": "Could not enqueue update."})}
+
+    return {"statusCode": 200, "body": json.dumps({"message": "Update queued."})}
+
+def worker_lambda(event, context):
+    """
+    SQS-triggered entry point that processes queued Telegram updates.
+    Configure the trigger with a batch size (e.g. BatchSize=10) so one warm invocation
+    handles several updates with the same bot instance and AWS connections.
+    Enable ReportBatchItemFailures on the trigger: updates that fail with a 5xx are
+    reported back so SQS redelivers them, while 4xx (malformed) updates are dropped.
+    """
+    records = event.get("Records", [])
+    failures = []
+    for record in records:
+        # lambda_handler handles and logs its own errors, so one bad update
+        # does not stop the rest of the batch
+        result = lambda_handler({"body": record.get("body", "")}, context)
+        if result.get("statusCode", 500) >= 500:
+            failures.append({"itemIdentifier": record["messageId"]})
+
+    print(f"✅ Processed {len(records)} queued update(s), {len(failures)} failed.")
+    return {"batchItemFailures": failures}